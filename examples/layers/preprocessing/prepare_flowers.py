@@ -0,0 +1,68 @@
+# Copyright 2022 The KerasCV Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""prepare_flowers.py writes pre-resized oxford_flowers102 TFRecord shards.
+
+The flowers are decoded and resized once to uint8 images and serialized as
+fixed-size `tf.train.Example`s.  The shards can then be read with
+`demo_utils.load_prepared_dataset()`, which skips JPEG decoding and resizing.
+"""
+import contextlib
+import os
+
+import demo_utils
+import tensorflow as tf
+import tensorflow_datasets as tfds
+
+NUM_SHARDS = 8
+
+
+def serialize(image, label):
+    feature = {
+        "image": tf.train.Feature(
+            bytes_list=tf.train.BytesList(value=[image.numpy().tobytes()])
+        ),
+        "label": tf.train.Feature(
+            int64_list=tf.train.Int64List(value=[int(label.numpy())])
+        ),
+    }
+    example = tf.train.Example(features=tf.train.Features(feature=feature))
+    return example.SerializeToString()
+
+
+def main():
+    ds = tfds.load("oxford_flowers102", split="train", as_supervised=True)
+    ds = ds.map(
+        lambda x, y: demo_utils.resize(x, y, img_size=demo_utils.PREPARED_IMG_SIZE),
+        num_parallel_calls=tf.data.AUTOTUNE,
+    )
+
+    os.makedirs(demo_utils.PREPARED_DATA_DIR, exist_ok=True)
+    with contextlib.ExitStack() as stack:
+        writers = [
+            stack.enter_context(
+                tf.io.TFRecordWriter(
+                    os.path.join(
+                        demo_utils.PREPARED_DATA_DIR,
+                        f"train.tfrecord-{i:05d}-of-{NUM_SHARDS:05d}",
+                    )
+                )
+            )
+            for i in range(NUM_SHARDS)
+        ]
+        for i, (image, label) in enumerate(ds):
+            writers[i % NUM_SHARDS].write(serialize(image, label))
+
+
+if __name__ == "__main__":
+    main()
@@ -238,7 +238,10 @@ def DenseNet(
     if include_top:
         x = layers.GlobalAveragePooling2D(name="avg_pool")(x)
         x = layers.Dense(
-            num_classes, activation=classifier_activation, name="predictions"
+            num_classes,
+            activation=classifier_activation,
+            dtype="float32",
+            name="predictions",
         )(x)
     elif pooling == "avg":
         x = layers.GlobalAveragePooling2D(name="avg_pool")(x)
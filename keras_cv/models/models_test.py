@@ -15,6 +15,7 @@
 
 import tensorflow as tf
 from absl.testing import parameterized
+from tensorflow import keras
 from tensorflow.keras import backend
 
 from keras_cv.models import densenet
@@ -109,6 +110,21 @@ class ApplicationsTest(tf.test.TestCase, parameterized.TestCase):
         self.assertShapeEqual(output_shape, (None, None, None, last_dim))
         backend.clear_session()
 
+    @parameterized.parameters(*MODEL_LIST)
+    def test_application_mixed_precision(self, app, _):
+        keras.mixed_precision.set_global_policy("mixed_float16")
+        self.addCleanup(keras.mixed_precision.set_global_policy, "float32")
+        model = app(
+            input_shape=(224, 224, 3),
+            include_top=True,
+            num_classes=10,
+            include_rescaling=False,
+            weights=None,
+        )
+        # The classifier head should stay in float32 for numerical stability.
+        self.assertEqual(model.output.dtype, tf.float32)
+        backend.clear_session()
+
 
 def _get_output_shape(model_fn):
     model = model_fn()